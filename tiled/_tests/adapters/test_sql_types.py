@@ -1,22 +1,47 @@
+import asyncio
 import decimal
+import functools
 import os
-from pathlib import Path
-from typing import AsyncGenerator, Generator, Literal, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Generator,
+    Literal,
+    cast,
+)
 
 import numpy
+import pandas
 import pyarrow as pa
 import pytest
 import pytest_asyncio
 
 from tiled._tests.utils import temp_postgres
 from tiled.adapters.sql import (
+    DIALECTS,
+    _arrow_schema_to_column_defns,
+    _arrow_schema_to_create_table,
+    _invalidate_schema_cache,
     arrow_schema_to_column_defns,
     arrow_schema_to_create_table,
     create_connection,
 )
 
+if TYPE_CHECKING:
+    import adbc_driver_manager.dbapi
+
+
+@pytest.fixture(scope="module")
+def event_loop() -> Generator[asyncio.AbstractEventLoop, None, None]:
+    # https://stackoverflow.com/a/56238383/1221924
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="module")
 async def postgresql_uri() -> AsyncGenerator[str, None]:
     uri = os.getenv("TILED_TEST_POSTGRESQL_URI")
     if uri is None:
@@ -27,14 +52,101 @@ async def postgresql_uri() -> AsyncGenerator[str, None]:
         # yield uri_with_database_name.rsplit("/", 1)[0]
 
 
-@pytest_asyncio.fixture
-def sqlite_uri(tmp_path: Path) -> Generator[str, None, None]:
-    yield f"sqlite:///{tmp_path}/test.db"
+@pytest.fixture(scope="module")
+def sqlite_uri(tmpdir_module: Any) -> Generator[str, None, None]:
+    yield f"sqlite:///{tmpdir_module}/sqlite.db"
+
+
+@pytest.fixture(scope="module")
+def duckdb_uri(tmpdir_module: Any) -> Generator[str, None, None]:
+    yield f"duckdb:///{tmpdir_module}/duckdb.db"
+
+
+# One connection per dialect is shared by all the tests in this module,
+# rather than connecting (and disconnecting) once per test case. The ADBC
+# drivers are only imported (by create_connection) for the dialects under
+# test, and a missing driver skips that dialect rather than erroring.
+
+
+@pytest.fixture(scope="module")
+def postgresql_conn(
+    postgresql_uri: str,
+) -> Generator["adbc_driver_manager.dbapi.Connection", None, None]:
+    pytest.importorskip("adbc_driver_postgresql")
+    conn = create_connection(postgresql_uri)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def sqlite_conn(
+    sqlite_uri: str,
+) -> Generator["adbc_driver_manager.dbapi.Connection", None, None]:
+    pytest.importorskip("adbc_driver_sqlite")
+    conn = create_connection(sqlite_uri)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def duckdb_conn(
+    duckdb_uri: str,
+) -> Generator["adbc_driver_manager.dbapi.Connection", None, None]:
+    pytest.importorskip("adbc_driver_duckdb")
+    conn = create_connection(duckdb_uri)
+    yield conn
+    conn.close()
+
+
+def _prepare_tables(conn: "adbc_driver_manager.dbapi.Connection", dialect: str) -> None:
+    """
+    Create and populate the tables for all test cases supported by dialect.
 
+    All the tables are created in one transaction and populated in another,
+    reusing a single cursor throughout.
+    """
+    test_cases = {
+        test_case_id: table_factory()
+        for test_case_id, (table_factory, dialect_results) in TEST_CASES.items()
+        if dialect in dialect_results
+    }
+    with conn.cursor() as cursor:
+        for test_case_id, table in test_cases.items():
+            cursor.execute(
+                arrow_schema_to_create_table(
+                    table.schema, f"test_{test_case_id}", cast(DIALECTS, dialect)
+                )
+            )
+        conn.commit()
+        for test_case_id, table in test_cases.items():
+            # Stream the batches so that ADBC sends the data in one shot.
+            reader = pa.RecordBatchReader.from_batches(table.schema, table.to_batches())
+            cursor.adbc_ingest(f"test_{test_case_id}", reader, mode="append")
+        conn.commit()
+
+
+@pytest.fixture(scope="module")
+def postgresql_prepared_conn(
+    postgresql_conn: "adbc_driver_manager.dbapi.Connection",
+) -> "adbc_driver_manager.dbapi.Connection":
+    _prepare_tables(postgresql_conn, "postgresql")
+    return postgresql_conn
 
-@pytest_asyncio.fixture
-def duckdb_uri(tmp_path: Path) -> Generator[str, None, None]:
-    yield f"duckdb:///{tmp_path}/test.db"
+
+@pytest.fixture(scope="module")
+def sqlite_prepared_conn(
+    sqlite_conn: "adbc_driver_manager.dbapi.Connection",
+) -> "adbc_driver_manager.dbapi.Connection":
+    _prepare_tables(sqlite_conn, "sqlite")
+    return sqlite_conn
+
+
+@pytest.fixture(scope="module")
+def duckdb_prepared_conn(
+    duckdb_conn: "adbc_driver_manager.dbapi.Connection",
+) -> "adbc_driver_manager.dbapi.Connection":
+    _prepare_tables(duckdb_conn, "duckdb")
+    return duckdb_conn
 
 
 INT8_INFO = numpy.iinfo(numpy.int8)
@@ -48,13 +160,25 @@ UINT64_INFO = numpy.iinfo(numpy.uint64)
 FLOAT16_INFO = numpy.finfo(numpy.float16)
 FLOAT32_INFO = numpy.finfo(numpy.float32)
 FLOAT64_INFO = numpy.finfo(numpy.float64)
+
+
+def _lazy_table(values: Any, type_: Any) -> Callable[[], pa.Table]:
+    "Return a factory for a one-column table, built on first use and then reused."
+
+    @functools.lru_cache(maxsize=None)
+    def factory() -> pa.Table:
+        return pa.table({"x": pa.array(values, type_)})
+
+    return factory
+
+
 # Map schemas (testing different data types or combinations of data types)
 # to an inner mapping. The inner mapping maps each dialect to a tuple,
 # (SQL type definition, Arrow type read back).
-# { test_case_id:  (input_table, {dialect: (expected_typedefs, expected_schema)})}
+# { test_case_id:  (input_table_factory, {dialect: (expected_typedefs, expected_schema)})}
 TEST_CASES = {
     "bool": (
-        pa.Table.from_arrays([pa.array([True, False], "bool")], names=["x"]),
+        _lazy_table([True, False], "bool"),
         {
             "duckdb": (["BOOLEAN NULL"], pa.schema([("x", "bool")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -62,7 +186,7 @@ TEST_CASES = {
         },
     ),
     "string": (
-        pa.Table.from_arrays([pa.array(["a", "b"], "string")], names=["x"]),
+        _lazy_table(["a", "b"], "string"),
         {
             "duckdb": (["VARCHAR NULL"], pa.schema([("x", "string")])),
             "sqlite": (["TEXT NULL"], pa.schema([("x", "string")])),
@@ -70,9 +194,7 @@ TEST_CASES = {
         },
     ),
     "int8": (
-        pa.Table.from_arrays(
-            [pa.array([INT8_INFO.min, INT8_INFO.max], "int8")], names=["x"]
-        ),
+        _lazy_table([INT8_INFO.min, INT8_INFO.max], "int8"),
         {
             "duckdb": (["TINYINT NULL"], pa.schema([("x", "int8")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -80,9 +202,7 @@ TEST_CASES = {
         },
     ),
     "int16": (
-        pa.Table.from_arrays(
-            [pa.array([INT16_INFO.min, INT16_INFO.max], "int16")], names=["x"]
-        ),
+        _lazy_table([INT16_INFO.min, INT16_INFO.max], "int16"),
         {
             "duckdb": (["SMALLINT NULL"], pa.schema([("x", "int16")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -90,9 +210,7 @@ TEST_CASES = {
         },
     ),
     "int32": (
-        pa.Table.from_arrays(
-            [pa.array([INT32_INFO.min, INT32_INFO.max], "int32")], names=["x"]
-        ),
+        _lazy_table([INT32_INFO.min, INT32_INFO.max], "int32"),
         {
             "duckdb": (["INTEGER NULL"], pa.schema([("x", "int32")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -100,9 +218,7 @@ TEST_CASES = {
         },
     ),
     "int64": (
-        pa.Table.from_arrays(
-            [pa.array([INT64_INFO.min, INT64_INFO.max], "int64")], names=["x"]
-        ),
+        _lazy_table([INT64_INFO.min, INT64_INFO.max], "int64"),
         {
             "duckdb": (["BIGINT NULL"], pa.schema([("x", "int64")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -110,9 +226,7 @@ TEST_CASES = {
         },
     ),
     "uint8": (
-        pa.Table.from_arrays(
-            [pa.array([UINT8_INFO.min, UINT8_INFO.max], "uint8")], names=["x"]
-        ),
+        _lazy_table([UINT8_INFO.min, UINT8_INFO.max], "uint8"),
         {
             "duckdb": (["UTINYINT NULL"], pa.schema([("x", "uint8")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -120,9 +234,7 @@ TEST_CASES = {
         },
     ),
     "uint16": (
-        pa.Table.from_arrays(
-            [pa.array([UINT16_INFO.min, UINT16_INFO.max], "uint16")], names=["x"]
-        ),
+        _lazy_table([UINT16_INFO.min, UINT16_INFO.max], "uint16"),
         {
             "duckdb": (["USMALLINT NULL"], pa.schema([("x", "uint16")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -130,9 +242,7 @@ TEST_CASES = {
         },
     ),
     "uint32": (
-        pa.Table.from_arrays(
-            [pa.array([UINT32_INFO.min, UINT32_INFO.max], "uint32")], names=["x"]
-        ),
+        _lazy_table([UINT32_INFO.min, UINT32_INFO.max], "uint32"),
         {
             "duckdb": (["UINTEGER NULL"], pa.schema([("x", "uint32")])),
             "sqlite": (["INTEGER NULL"], pa.schema([("x", "int64")])),
@@ -140,17 +250,13 @@ TEST_CASES = {
         },
     ),
     "uint64": (
-        pa.Table.from_arrays(
-            [pa.array([UINT64_INFO.min, UINT64_INFO.max], "uint64")], names=["x"]
-        ),
+        _lazy_table([UINT64_INFO.min, UINT64_INFO.max], "uint64"),
         {
             "duckdb": (["UBIGINT NULL"], pa.schema([("x", "uint64")])),
         },
     ),
     "list_of_ints": (
-        pa.Table.from_arrays(
-            [pa.array([[1, 2], [3, 4]], pa.list_(pa.int32()))], names=["x"]
-        ),
+        _lazy_table([[1, 2], [3, 4]], pa.list_(pa.int32())),
         {
             "duckdb": (["INTEGER[] NULL"], pa.schema([("x", pa.list_(pa.int32()))])),
             "postgresql": (
@@ -160,9 +266,7 @@ TEST_CASES = {
         },
     ),
     "list_of_bounded_ints": (
-        pa.Table.from_arrays(
-            [pa.array([[1, 2], [3, 4]], pa.list_(pa.int32(), 2))], names=["x"]
-        ),
+        _lazy_table([[1, 2], [3, 4]], pa.list_(pa.int32(), 2)),
         {
             "duckdb": (["INTEGER[] NULL"], pa.schema([("x", pa.list_(pa.int32()))])),
             "postgresql": (
@@ -172,15 +276,11 @@ TEST_CASES = {
         },
     ),
     "float16": (
-        pa.Table.from_arrays(
-            [pa.array([FLOAT16_INFO.min, FLOAT16_INFO.max], "float16")], names=["x"]
-        ),
+        _lazy_table([FLOAT16_INFO.min, FLOAT16_INFO.max], "float16"),
         {},  # not supported by any backend
     ),
     "float32": (
-        pa.Table.from_arrays(
-            [pa.array([FLOAT32_INFO.min, FLOAT32_INFO.max], "float32")], names=["x"]
-        ),
+        _lazy_table([FLOAT32_INFO.min, FLOAT32_INFO.max], "float32"),
         {
             "duckdb": (["REAL NULL"], pa.schema([("x", "float32")])),
             "sqlite": (["REAL NULL"], pa.schema([("x", "double")])),
@@ -188,9 +288,7 @@ TEST_CASES = {
         },
     ),
     "float64": (
-        pa.Table.from_arrays(
-            [pa.array([FLOAT64_INFO.min, FLOAT64_INFO.max], "float64")], names=["x"]
-        ),
+        _lazy_table([FLOAT64_INFO.min, FLOAT64_INFO.max], "float64"),
         {
             "duckdb": (["DOUBLE NULL"], pa.schema([("x", "float64")])),
             "sqlite": (["REAL NULL"], pa.schema([("x", "double")])),
@@ -198,9 +296,7 @@ TEST_CASES = {
         },
     ),
     "decimal": (
-        pa.Table.from_arrays(
-            [pa.array([decimal.Decimal("123.45")], pa.decimal128(5, 2))], names=["x"]
-        ),
+        _lazy_table([decimal.Decimal("123.45")], pa.decimal128(5, 2)),
         {
             "duckdb": (["DECIMAL(5, 2) NULL"], pa.schema([("x", pa.decimal128(5, 2))])),
         },
@@ -208,7 +304,16 @@ TEST_CASES = {
 }
 
 
-@pytest.mark.parametrize("dialect", ["duckdb", "postgresql", "sqlite"])
+# The dialects are independent, so when running under pytest-xdist with
+# --dist=loadgroup each dialect is sent to its own worker, where it reuses the
+# module-scoped connection for that dialect.
+DIALECT_PARAMS = [
+    pytest.param(dialect, marks=pytest.mark.xdist_group(name=f"dialect-{dialect}"))
+    for dialect in ["duckdb", "postgresql", "sqlite"]
+]
+
+
+@pytest.mark.parametrize("dialect", DIALECT_PARAMS)
 @pytest.mark.parametrize("test_case_id", list(TEST_CASES))
 def test_data_types(
     test_case_id: str,
@@ -216,7 +321,8 @@ def test_data_types(
     request: pytest.FixtureRequest,
 ) -> None:
     test_table_name = f"test_{test_case_id}"
-    table, dialect_results = TEST_CASES[test_case_id]
+    table_factory, dialect_results = TEST_CASES[test_case_id]
+    table = table_factory()
 
     if dialect not in cast(dict, dialect_results):  # type: ignore
         with pytest.raises(ValueError, match="Unsupported PyArrow type"):
@@ -224,38 +330,61 @@ def test_data_types(
         return
 
     expected_typedefs, expected_schema = dialect_results[dialect]  # type: ignore
-    db_uri = request.getfixturevalue(f"{dialect}_uri")
+    # The table has already been created and populated, along with the tables
+    # for all the other test cases, by the {dialect}_prepared_conn fixture.
+    conn = request.getfixturevalue(f"{dialect}_prepared_conn")
     columns = arrow_schema_to_column_defns(table.schema, dialect)
     assert list(columns.values()) == expected_typedefs
 
-    query = arrow_schema_to_create_table(table.schema, test_table_name, dialect)
+    # The schema is checked only once, after ingest. The CREATE TABLE statement
+    # is generated by our own code (and checked against expected_typedefs
+    # above), so it does not need to be re-verified before data arrives.
+    # For SQLite specifically, it cannot be: some inference is needed by ADBC
+    # to get the type and on an empty table the value is not defined.
+    # https://github.com/apache/arrow-adbc/issues/581
+    assert conn.adbc_get_table_schema(test_table_name) == expected_schema
 
-    with create_connection(db_uri) as conn:
-        with conn.cursor() as cursor:
-            cursor.execute(query)
-        conn.commit()
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT * FROM {test_table_name}")
+        result = cursor.fetch_arrow_table()
+    conn.commit()
 
-        # For SQLite specifically, some inference is needed by ADBC to get the type
-        # and on an empty table the value is not defined. As of this writing it is
-        # int64 by default; in the future it may be null.
-        # https://github.com/apache/arrow-adbc/issues/581
-        if dialect != "sqlite":
-            assert conn.adbc_get_table_schema(test_table_name) == expected_schema
+    # The result will match expected_schema, which may not be the same as
+    # the schema the data was uploaded as, if the databases does not support
+    # that precise type.
+    assert result.schema == expected_schema
 
-        with conn.cursor() as cursor:
-            cursor.adbc_ingest(test_table_name, table, mode="append")
+    # Before comparing the Tables, we cast the Table into the original schema,
+    # which might use finer types.
+    assert result.cast(table.schema) == table
 
-        assert conn.adbc_get_table_schema(test_table_name) == expected_schema
 
-        with conn.cursor() as cursor:
-            cursor.execute(f"SELECT * FROM {test_table_name}")
-            result = cursor.fetch_arrow_table()
+def test_column_defns_are_cached() -> None:
+    _invalidate_schema_cache()
+    schema = pa.schema([("x", "int32"), ("y", "string")])
+    first = arrow_schema_to_column_defns(schema, "duckdb")
+    # Mutating the result must not corrupt the cache.
+    first["x"] = "garbage"
+    second = arrow_schema_to_column_defns(schema, "duckdb")
+    assert second == {"x": "INTEGER NULL", "y": "VARCHAR NULL"}
+    assert _arrow_schema_to_column_defns.cache_info().hits == 1
+    statement = arrow_schema_to_create_table(schema, "t", "duckdb")
+    assert arrow_schema_to_create_table(schema, "t", "duckdb") is statement
+    _invalidate_schema_cache()
+    assert _arrow_schema_to_column_defns.cache_info().currsize == 0
+    assert _arrow_schema_to_create_table.cache_info().currsize == 0
 
-        # The result will match expected_schema, which may not be the same as
-        # the schema the data was uploaded as, if the databases does not support
-        # that precise type.
-        assert result.schema == expected_schema
 
-        # Before comparing the Tables, we cast the Table into the original schema,
-        # which might use finer types.
-        assert result.cast(table.schema) == table
+def test_column_defns_of_schema_with_metadata() -> None:
+    # Schemas derived from pandas carry (unhashable) dict metadata.
+    _invalidate_schema_cache()
+    schema = pa.Table.from_pandas(
+        pandas.DataFrame({"x": numpy.arange(3, dtype="int32")})
+    ).schema
+    assert schema.metadata
+    assert arrow_schema_to_column_defns(schema, "duckdb") == {"x": "INTEGER NULL"}
+    assert "x INTEGER NULL" in arrow_schema_to_create_table(schema, "t", "duckdb")
+    assert arrow_schema_to_column_defns(schema, "postgresql") == {"x": "INTEGER NULL"}
+    # The metadata does not affect the cache key.
+    arrow_schema_to_column_defns(schema.remove_metadata(), "duckdb")
+    assert _arrow_schema_to_column_defns.cache_info().hits == 2
@@ -4,10 +4,15 @@ import shutil
 import subprocess
 import sys
 import time
+import uuid
 
 import numpy
 import pytest
-from starlette.status import HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED
+from starlette.status import (
+    HTTP_400_BAD_REQUEST,
+    HTTP_401_UNAUTHORIZED,
+    HTTP_404_NOT_FOUND,
+)
 
 from ..adapters.array import ArrayAdapter
 from ..adapters.mapping import MapAdapter
@@ -104,6 +109,26 @@ def test_password_auth(enter_username_password, config):
                 from_context(context)
 
 
+def test_access_token_decoded_once_per_request(
+    enter_username_password, config, monkeypatch
+):
+    decode_token = authentication.decode_token
+    calls = []
+
+    def counting_decode_token(*args, **kwargs):
+        calls.append(args)
+        return decode_token(*args, **kwargs)
+
+    monkeypatch.setattr(authentication, "decode_token", counting_decode_token)
+    with Context.from_app(build_app_from_config(config)) as context:
+        with enter_username_password("alice", "secret1"):
+            from_context(context)
+        calls.clear()
+        # This route depends on the access token under several sets of scopes.
+        context.http_client.get("/api/v1/node/full/").raise_for_status()
+        assert len(calls) == 1
+
+
 def test_remember_me(enter_username_password, config):
     with Context.from_app(build_app_from_config(config)) as context:
         # Log in as Alice.
@@ -254,6 +279,32 @@ def test_revoke_session(enter_username_password, config):
             client.context.force_auth_refresh()
 
 
+def test_revoke_session_of_other_principal(enter_username_password, config):
+    with Context.from_app(build_app_from_config(config)) as context:
+        with enter_username_password("alice", "secret1"):
+            client = from_context(context)
+        alice_tokens = dict(client.context.tokens)
+        (alice_session,) = client.context.whoami()["sessions"]
+        # Log in as Bob without logging Alice out, so that her session stays live.
+        with enter_username_password("bob", "secret2"):
+            context.authenticate()
+        # Bob cannot revoke Alice's session...
+        with fail_with_status_code(HTTP_404_NOT_FOUND):
+            context.revoke_session(alice_session["uuid"])
+        # ...or one that does not exist.
+        with fail_with_status_code(HTTP_404_NOT_FOUND):
+            context.revoke_session(uuid.uuid4().hex)
+        (bob_session,) = context.whoami()["sessions"]
+        assert bob_session["uuid"] != alice_session["uuid"]
+        assert not bob_session["revoked"]
+        # Alice's session was left alone.
+        context.configure_auth(alice_tokens)
+        (session,) = context.whoami()["sessions"]
+        assert session["uuid"] == alice_session["uuid"]
+        assert not session["revoked"]
+        context.force_auth_refresh()
+
+
 def test_multiple_providers(enter_username_password, config, monkeypatch):
     """
     Test a configuration with multiple identity providers.
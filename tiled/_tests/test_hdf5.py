@@ -1,4 +1,5 @@
 import os
+import warnings
 
 import numpy
 import pytest
@@ -163,6 +164,32 @@ def test_from_file_with_vlen_str_dataset(example_file_with_vlen_str_in_dataset,
     file["a"]["b"]["c"]["d"]
 
 
+def test_empty_vlen_str_dataset_does_not_warn(tmp_path):
+    """An empty object-type dataset is served as a placeholder without a warning."""
+    h5py = pytest.importorskip("h5py")
+    file_path = tmp_path / "empty_vlen_str.h5"
+    with h5py.File(file_path, "w") as file:
+        file.create_dataset("d", (0,), dtype=h5py.string_dtype(encoding="utf-8"))
+    tree = HDF5Adapter.from_uris(ensure_uri(file_path))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        arr = tree["d"].read()
+    assert isinstance(arr, numpy.ndarray)
+
+
+def test_vlen_non_str_dataset(tmp_path):
+    """A non-string object-type dataset is served as an empty placeholder."""
+    h5py = pytest.importorskip("h5py")
+    file_path = tmp_path / "vlen_int.h5"
+    with h5py.File(file_path, "w") as file:
+        dset = file.create_dataset("d", (1,), dtype=h5py.vlen_dtype(numpy.int32))
+        dset[0] = numpy.arange(3, dtype=numpy.int32)
+    tree = HDF5Adapter.from_uris(ensure_uri(file_path))
+    with pytest.warns(UserWarning):
+        adapter = tree["d"]
+    assert adapter.read().shape == ()
+
+
 def test_from_group(example_file, buffer):
     """Serve a Group within an HDF5 file."""
     h5py = pytest.importorskip("h5py")
@@ -220,6 +247,109 @@ def test_inlined_contents(example_file):
         hdf5_adapters.INLINED_DEPTH = original
 
 
+def test_metadata_read_once(example_file, monkeypatch):
+    """The attributes of an HDF5 group are read from the file only once."""
+    calls = []
+    original = hdf5_adapters.get_hdf5_attrs
+
+    def counting_get_hdf5_attrs(*args, **kwargs):
+        calls.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(hdf5_adapters, "get_hdf5_attrs", counting_get_hdf5_attrs)
+    adapter = HDF5Adapter.from_uris(example_file)["a"]
+    metadata = adapter.metadata()
+    metadata["mutated"] = True  # must not leak into later calls
+    assert "mutated" not in adapter.metadata()
+    assert len(calls) == 1
+
+
+def test_metadata_uses_file_options(example_file, monkeypatch):
+    """The swmr and libver options are used when reading group attributes."""
+    calls = []
+
+    def recording_get_hdf5_attrs(*args, **kwargs):
+        calls.append(kwargs)
+        return {}
+
+    monkeypatch.setattr(hdf5_adapters, "get_hdf5_attrs", recording_get_hdf5_attrs)
+    HDF5Adapter.from_uris(example_file, libver="v110")["a"].metadata()
+    assert calls == [{"swmr": hdf5_adapters.SWMR_DEFAULT, "libver": "v110"}]
+
+
+def test_items_slice_accesses_only_window(example_file_with_empty_data, monkeypatch):
+    """Slicing items() only constructs adapters for the keys in the slice."""
+    adapter = HDF5Adapter.from_uris(example_file_with_empty_data)["a/b/c"]
+    accessed = []
+    original = HDF5Adapter.__getitem__
+
+    def recording_getitem(self, key):
+        accessed.append(key)
+        return original(self, key)
+
+    monkeypatch.setattr(HDF5Adapter, "__getitem__", recording_getitem)
+    assert [key for key, _ in adapter.items()[1:3]] == ["e", "f"]
+    assert [key for key, _ in adapter.items()[-1:-3:-1]] == ["i", "h"]
+    assert accessed == ["e", "f", "i", "h"]
+
+
+def test_structure_argument_is_ignored(example_file):
+    with pytest.warns(DeprecationWarning) as record:
+        tree = HDF5Adapter.from_uris(example_file, structure=None)
+    # Warn once, attributed to the user's code so default filters show it.
+    assert len(record) == 1
+    assert record[0].filename == __file__
+    assert "structure" not in tree._kwargs
+    assert tree["a"]["b"]["c"]["d"].read().shape == (3, 3)
+
+
+def test_keys_follow_tracked_creation_order(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    file_path = tmp_path / "ordered.h5"
+    with h5py.File(file_path, "w") as file:
+        group = file.create_group("g", track_order=True)
+        for name in ["z", "b", "y"]:
+            group.create_dataset(name, data=numpy.arange(3))
+        group["broken"] = h5py.SoftLink("/missing")
+    tree = HDF5Adapter.from_uris(ensure_uri(file_path))
+    assert list(tree["g"]) == ["z", "b", "y", "broken"]
+
+
+def test_child_dataset_paths(example_file):
+    tree = HDF5Adapter.from_uris(example_file, dataset="/")
+    assert tree["a"].dataset == "/a"
+    assert tree["a"]["b"].dataset == "/a/b"
+
+
+def test_child_structure_follows_resized_dataset(tmp_path):
+    """A dataset that grows after the parent adapter is created is seen at its new size."""
+    h5py = pytest.importorskip("h5py")
+    file_path = tmp_path / "growing.h5"
+    with h5py.File(file_path, "w") as file:
+        file.create_dataset("d", data=numpy.arange(3), maxshape=(None,))
+    tree = HDF5Adapter.from_uris(ensure_uri(file_path))
+    assert tree["d"].structure().shape == (3,)
+    with h5py.File(file_path, "a") as file:
+        file["d"].resize((10,))
+        file["d"][3:] = numpy.arange(3, 10)
+    assert tree["d"].structure().shape == (10,)
+    assert tree["d"].read().shape == (10,)
+
+
+def test_file_can_be_written_after_read(tmp_path):
+    """Reading a dataset does not keep the file open, so it can then be extended."""
+    h5py = pytest.importorskip("h5py")
+    file_path = tmp_path / "appended.h5"
+    with h5py.File(file_path, "w") as file:
+        file.create_dataset("d", data=numpy.arange(3), maxshape=(None,))
+    tree = HDF5Adapter.from_uris(ensure_uri(file_path))
+    assert tree["d"].read().shape == (3,)
+    with h5py.File(file_path, "a") as file:
+        file["d"].resize((10,))
+    assert tree["d"].structure().shape == (10,)
+    assert tree["d"].read().shape == (10,)
+
+
 def test_file_with_links(example_file_with_links, buffer):
     """Serve an HDF5 file with internal and external links."""
 
@@ -0,0 +1,161 @@
+import base64
+import time
+import warnings
+from datetime import timedelta
+
+import orjson
+import pytest
+from fastapi import HTTPException
+
+from ..server import jwt_backend
+from ..server.authentication import (
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+    utcnow,
+)
+
+SECRET = "SECRET"
+
+
+def test_round_trip():
+    token = jwt_backend.encode({"sub": "alice", "exp": utcnow() + timedelta(1)}, SECRET)
+    payload = jwt_backend.decode(token, SECRET)
+    assert payload["sub"] == "alice"
+    assert isinstance(payload["exp"], int)
+
+
+def test_header():
+    token = jwt_backend.encode({"sub": "alice"}, SECRET)
+    assert jwt_backend.get_unverified_header(token) == {
+        "alg": "HS256",
+        "typ": "JWT",
+        "kid": jwt_backend.key_id(SECRET),
+    }
+
+
+def test_interoperates_with_jose():
+    "Tokens issued by earlier versions of tiled (via python-jose) remain valid."
+    with warnings.catch_warnings():
+        # jose triggers a deprecation warning from cryptography on import.
+        warnings.simplefilter("ignore")
+        from jose import jwt as jose_jwt
+
+    claims = {
+        "sid": "abc",
+        "exp": utcnow() + timedelta(minutes=5),
+        "state": {1: "int key", "nested": {2.5: None}},
+    }
+    assert jwt_backend.decode(jose_jwt.encode(claims, SECRET), SECRET) == (
+        jose_jwt.decode(jose_jwt.encode(claims, SECRET), SECRET)
+    )
+    token = jwt_backend.encode(claims, SECRET)
+    assert jose_jwt.decode(token, SECRET, algorithms=["HS256"]) == (
+        jwt_backend.decode(token, SECRET)
+    )
+
+
+def test_expired():
+    token = jwt_backend.encode({"exp": utcnow() - timedelta(seconds=1)}, SECRET)
+    with pytest.raises(jwt_backend.ExpiredSignatureError):
+        jwt_backend.decode(token, SECRET)
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda token: token[:-2],
+        lambda token: token.replace(".", "", 1),
+        lambda token: "not a token",
+        # Swap in an unsigned ("alg": "none") header.
+        lambda token: "eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0." + token.split(".", 1)[1],
+    ],
+)
+def test_invalid(mangle):
+    token = jwt_backend.encode({"sub": "alice"}, SECRET)
+    with pytest.raises(jwt_backend.JWTError):
+        jwt_backend.decode(mangle(token), SECRET)
+
+
+def test_signer_is_reused_per_key():
+    jwt_backend._keyed_hmac.cache_clear()
+    for _ in range(3):
+        jwt_backend.decode(jwt_backend.encode({"sub": "alice"}, SECRET), SECRET)
+    assert jwt_backend._keyed_hmac.cache_info().misses == 1
+
+
+def test_wrong_key():
+    token = jwt_backend.encode({"sub": "alice"}, SECRET)
+    with pytest.raises(jwt_backend.JWTError):
+        jwt_backend.decode(token, "OTHER SECRET")
+
+
+def test_token_expiration_claims():
+    before = int(time.time())
+    access_token = create_access_token({"sub": "alice"}, SECRET, timedelta(minutes=5))
+    refresh_token = create_refresh_token("abc", SECRET, timedelta(days=7))
+    after = int(time.time())
+    access_exp = jwt_backend.decode(access_token, SECRET)["exp"]
+    refresh_exp = jwt_backend.decode(refresh_token, SECRET)["exp"]
+    assert isinstance(access_exp, int)
+    assert before + 5 * 60 <= access_exp <= after + 5 * 60
+    assert before + 7 * 24 * 3600 <= refresh_exp <= after + 7 * 24 * 3600
+
+
+def test_tokens_decode_with_any_rotated_key():
+    access_token = create_access_token({"sub": "alice"}, "OLD", timedelta(minutes=5))
+    refresh_token = create_refresh_token("abc", "OLD", timedelta(minutes=5))
+    assert decode_token(access_token, ["NEW", "OLD"])["type"] == "access"
+    assert decode_token(refresh_token, ["NEW", "OLD"])["sid"] == "abc"
+
+
+def test_tokens_without_key_id_decode_with_any_rotated_key():
+    "Tokens issued by earlier versions of tiled have no kid header."
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from jose import jwt as jose_jwt
+
+    token = jose_jwt.encode({"sid": "abc"}, "OLD")
+    assert "kid" not in jwt_backend.get_unverified_header(token)
+    assert decode_token(token, ["NEW", "OLD"])["sid"] == "abc"
+    with pytest.raises(HTTPException):
+        decode_token(token, ["NEW"])
+
+
+def test_tokens_without_key_id_are_checked_against_every_key(monkeypatch):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from jose import jwt as jose_jwt
+
+    calls = []
+    decode = jwt_backend.decode
+
+    def counting_decode(token, key, *args, **kwargs):
+        calls.append(key)
+        return decode(token, key, *args, **kwargs)
+
+    monkeypatch.setattr(jwt_backend, "decode", counting_decode)
+    token = jose_jwt.encode({"sid": "abc"}, "NEW")
+    # The first key works, but the time taken should not reveal that.
+    assert decode_token(token, ["NEW", "OLD"])["sid"] == "abc"
+    assert calls == ["NEW", "OLD"]
+
+
+def test_tokens_with_unknown_key_id_are_rejected():
+    token = create_access_token({"sub": "alice"}, "RETIRED", timedelta(minutes=5))
+    with pytest.raises(HTTPException):
+        decode_token(token, ["NEW", "OLD"])
+
+
+@pytest.mark.parametrize("kid", [[], {}, 1, None])
+def test_tokens_with_invalid_key_id_are_rejected(kid):
+    token = create_access_token({"sub": "alice"}, "NEW", timedelta(minutes=5))
+    header = base64.urlsafe_b64encode(
+        orjson.dumps({"alg": "HS256", "typ": "JWT", "kid": kid})
+    ).rstrip(b"=")
+    token = header.decode() + "." + token.split(".", 1)[1]
+    with pytest.raises(jwt_backend.JWTError):
+        jwt_backend.get_unverified_header(token)
+    with pytest.raises(HTTPException) as info:
+        decode_token(token, ["NEW", "OLD"])
+    assert info.value.status_code == 401
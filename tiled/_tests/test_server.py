@@ -9,7 +9,7 @@ import numpy
 import pytest
 import uvicorn
 from fastapi import APIRouter
-from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_500_INTERNAL_SERVER_ERROR
 
 from ..adapters.array import ArrayAdapter
 from ..adapters.mapping import MapAdapter
@@ -144,6 +144,12 @@ def test_writing_integration(server):
     x[:]
 
 
+@pytest.mark.parametrize("api_key", ["wrong", "s\u00e9cret"])
+def test_invalid_single_user_api_key(server, api_key):
+    response = httpx.get(f"{server}/api/v1/metadata/", params={"api_key": api_key})
+    assert response.status_code == HTTP_401_UNAUTHORIZED
+
+
 def test_public_server(public_server):
     from_uri(public_server)
 
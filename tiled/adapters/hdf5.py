@@ -1,4 +1,6 @@
 import copy
+import functools
+import itertools
 import os
 import sys
 import warnings
@@ -71,11 +73,11 @@ def get_hdf5_attrs(
     """Get attributes of an HDF5 dataset"""
     file_path = path_from_uri(file_uri)
     with h5open(file_path, dataset=dataset, swmr=swmr, libver=libver, **kwargs) as node:
-        d = dict(getattr(node, "attrs", {}))
-        for k, v in d.items():
-            # Convert any bytes to str.
-            if isinstance(v, bytes):
-                d[k] = v.decode()
+        # Read each attribute once, converting any bytes to str.
+        d = {
+            k: (v.decode() if isinstance(v, bytes) else v)
+            for k, v in getattr(node, "attrs", {}).items()
+        }
     return d
 
 
@@ -123,6 +125,18 @@ class h5open(h5py.File):  # type: ignore
                 raise BrokenLink(exc_value.args[0]) from exc_value
 
 
+def _pop_structure_argument(kwargs: dict[str, Any]) -> None:
+    "Drop the deprecated structure argument, warning the caller of our caller"
+    if "structure" in kwargs:
+        warnings.warn(
+            "The structure argument of HDF5Adapter is unused and ignored; "
+            "it will be removed in a future release.",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        del kwargs["structure"]
+
+
 class HDF5ArrayAdapter(ArrayAdapter):
     """Adapter for array-type data stored in HDF5 files
 
@@ -173,29 +187,30 @@ class HDF5ArrayAdapter(ArrayAdapter):
             assert (
                 len(file_paths) == 1
             ), "Cannot handle object arrays from multiple files"
-            warnings.warn(
-                f"The dataset {dataset} is of object type, using a "
-                "Python-only feature of h5py that is not supported by "
-                "HDF5 in general. Read more about that feature at "
-                "https://docs.h5py.org/en/stable/special.html. "
-                "Consider using a fixed-length field instead. "
-                "Tiled will serve an empty placeholder, unless the "
-                "object is of size 1, where it will attempt to repackage "
-                "the data into a numpy array."
-            )
+            size = int(numpy.prod(shapes_chunks_dtypes[0][0]))
+            if size > 0:
+                # Nothing is served for an empty dataset, so do not warn about it.
+                warnings.warn(
+                    f"The dataset {dataset} is of object type, using a "
+                    "Python-only feature of h5py that is not supported by "
+                    "HDF5 in general. Read more about that feature at "
+                    "https://docs.h5py.org/en/stable/special.html. "
+                    "Consider using a fixed-length field instead. "
+                    "Tiled will serve an empty placeholder, unless the "
+                    "object is of size 1, where it will attempt to repackage "
+                    "the data into a numpy array."
+                )
 
-            check_str_dtype = h5py.check_string_dtype(dtype)
-            if check_str_dtype.length is None:
-                # TODO: refactor and test
+            # check_string_dtype returns None for object types other than
+            # strings (e.g. variable-length sequences); serve those as a placeholder.
+            string_info = h5py.check_string_dtype(dtype)
+            if string_info is not None and string_info.length is None and size == 1:
+                # Only read the data if it is going to be served, and read it
+                # directly from the dataset in a single call.
                 with h5open(
                     file_paths[0], dataset=dataset, swmr=swmr, libver=libver
                 ) as value:
-                    dataset_names = value.file[value.file.name + "/" + dataset][...][()]
-                    if value.size == 1:
-                        arr = dask.array.from_array(numpy.array(dataset_names))
-                    else:
-                        arr = dask.array.empty(shape=())
-                return arr
+                    return dask.array.from_array(numpy.array(value[()]))
             return dask.array.empty(shape=())
 
         delayed = [dask.delayed(_read_hdf5_array)(fpath) for fpath in file_paths]
@@ -342,7 +357,6 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         tree: Union[dict[str, Any], Sentinel],
         *data_uris: str,
         dataset: Optional[str] = None,
-        structure: Optional[ArrayStructure] = None,
         metadata: Optional[JSON] = None,
         specs: Optional[List[Spec]] = None,
         **kwargs: Optional[Any],
@@ -355,8 +369,11 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         self._tree: dict[str, Any] = tree  # type: ignore
         self.uris = data_uris
         self.dataset = dataset  # Referenced to the root of the file
+        # Path prefix of children, without doubling the slash when dataset is "/"
+        self._prefix = (dataset or "").rstrip("/") + "/"
         self.specs = specs or []
         self._metadata = metadata or {}
+        _pop_structure_argument(kwargs)
         self._kwargs = kwargs  # e.g. swmr, libver, etc.
 
     @classmethod
@@ -371,6 +388,7 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         libver: str = "latest",
         **kwargs: Optional[Any],
     ) -> Union["HDF5Adapter", HDF5ArrayAdapter]:
+        _pop_structure_argument(kwargs)
         # Convert the dataset representation (for backward compatibility)
         dataset = dataset or kwargs.get("path") or []
         if not isinstance(dataset, str):
@@ -408,7 +426,6 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
             tree,
             *data_uris,
             dataset=dataset,
-            structure=data_source.structure,
             metadata=node.metadata_,
             specs=node.specs,
             swmr=swmr,
@@ -425,6 +442,7 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         libver: str = "latest",
         **kwargs: Optional[Any],
     ) -> Union["HDF5Adapter", HDF5ArrayAdapter]:
+        _pop_structure_argument(kwargs)
         fpath = path_from_uri(data_uris[0])
         with h5open(fpath, dataset, swmr=swmr, libver=libver) as file:
             tree = parse_hdf5_tree(file)
@@ -444,8 +462,18 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
     def structure(self) -> None:
         return None
 
+    @functools.cached_property
+    def _file_metadata(self) -> JSON:
+        "The attributes of the HDF5 node, read from the file only once."
+        return get_hdf5_attrs(
+            self.uris[0],
+            self.dataset,
+            swmr=self._kwargs.get("swmr", SWMR_DEFAULT),
+            libver=self._kwargs.get("libver", "latest"),
+        )
+
     def metadata(self) -> JSON:
-        d = get_hdf5_attrs(self.uris[0], self.dataset)
+        d = dict(self._file_metadata)
         d.update(self._metadata)
         return d
 
@@ -454,9 +482,10 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         yield from self._tree
 
     def __getitem__(self, key: str) -> Union["HDF5Adapter", HDF5ArrayAdapter]:
-        dataset = f"{self.dataset or ''}/{key.strip('/')}"  # Referenced to the root of the file
+        key = key.strip("/")
+        dataset = self._prefix + key  # Referenced to the root of the file
         node = copy.deepcopy(self._tree)
-        for segment in key.strip("/").split("/"):
+        for segment in key.split("/"):
             if segment not in node:
                 raise NoEntry(
                     f"Can not access dataset {dataset} in {self.uris[0]}: {key} not found"
@@ -506,11 +535,15 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
 
     # The following two methods are used by keys(), values(), items().
 
+    @functools.cached_property
+    def _keys(self) -> List[str]:
+        "The keys of the group, listed once; the parsed tree is not updated."
+        return list(self._tree)
+
     def _keys_slice(self, start: int, stop: int, direction: int) -> List[Any]:
-        keys = list(self._tree.keys())
         if direction < 0:
-            keys = list(reversed(keys))
-        return keys[start:stop]
+            return list(itertools.islice(reversed(self._keys), start, stop))
+        return self._keys[start:stop]
 
     def _items_slice(
         self, start: int, stop: int, direction: int
@@ -527,10 +560,8 @@ class HDF5Adapter(Mapping[str, Union["HDF5Adapter", HDF5ArrayAdapter]], Indexers
         -------
 
         """
-        items = [(key, self[key]) for key in list(self)]
-        if direction < 0:
-            items = list(reversed(items))
-        return items[start:stop]
+        # Slice the keys first so that only the requested window is accessed.
+        return [(key, self[key]) for key in self._keys_slice(start, stop, direction)]
 
     def inlined_contents_enabled(self, depth: int) -> bool:
         return depth <= INLINED_DEPTH
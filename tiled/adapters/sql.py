@@ -1,4 +1,5 @@
 import copy
+import functools
 import hashlib
 import os
 import re
@@ -440,8 +441,8 @@ def arrow_field_to_pg_type(field: Union[pyarrow.Field, pyarrow.DataType]) -> str
 
     Parameters
     ----------
-    field : pyarrow.Field
-        The PyArrow field containing type and metadata information
+    field : Union[pyarrow.Field, pyarrow.DataType]
+        The PyArrow field or type to convert
 
     Returns
     -------
@@ -467,57 +468,49 @@ def arrow_field_to_pg_type(field: Union[pyarrow.Field, pyarrow.DataType]) -> str
     'text'
     """
 
-    def _resolve_type(
-        arrow_type: Union[pyarrow.Field, pyarrow.DataType]
-    ) -> Union[pyarrow.Field, pyarrow.DataType, str]:
-        """Internal helper to resolve type, handling nested cases."""
-        # Handle list types
-        if pyarrow.types.is_list(arrow_type):
-            value_type = _resolve_type(arrow_type.value_type)
-            return f"{value_type} ARRAY"
-
-        # Handle fixed size list types
-        if pyarrow.types.is_fixed_size_list(arrow_type):
-            value_type = _resolve_type(arrow_type.value_type)
-            return f"{value_type} ARRAY"
-
-        # Handle large list types
-        if pyarrow.types.is_large_list(arrow_type):
-            value_type = _resolve_type(arrow_type.value_type)
-            return f"{value_type} ARRAY"
+    arrow_type = field.type if isinstance(field, pyarrow.Field) else field
+    return _resolve_pg_type(arrow_type)
 
-        # TODO Consider adding support for these types, with testing.
 
-        # # Handle dictionary types - use value type
-        # if pyarrow.types.is_dictionary(arrow_type):
-        #     return _resolve_type(arrow_type.value_type)
+def _resolve_pg_type(arrow_type: pyarrow.DataType) -> str:
+    """Internal helper to resolve type, handling nested cases."""
+    # Look up base type first: this is the common case.
+    pg_type = ARROW_TO_PG_TYPES.get(arrow_type)
+    if pg_type is not None:
+        return pg_type
 
-        # # Handle timestamp with timezone
-        # if pyarrow.types.is_timestamp(arrow_type) and arrow_type.tz is not None:
-        #     return "timestamptz"
+    # Handle list types (including large lists and fixed size lists)
+    if (
+        pyarrow.types.is_list(arrow_type)
+        or pyarrow.types.is_large_list(arrow_type)
+        or pyarrow.types.is_fixed_size_list(arrow_type)
+    ):
+        value_type = _resolve_pg_type(arrow_type.value_type)
+        return f"{value_type} ARRAY"
 
-        # Look up base type
-        pg_type = ARROW_TO_PG_TYPES.get(arrow_type)
-        if pg_type is None:
-            raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
+    # TODO Consider adding support for these types, with testing.
 
-        # TODO Consider adding support for these types, with testing.
+    # # Handle dictionary types - use value type
+    # if pyarrow.types.is_dictionary(arrow_type):
+    #     return _resolve_pg_type(arrow_type.value_type)
 
-        # # Special handling for time types with different units
-        # if pyarrow.types.is_time(arrow_type):
-        #     return "time"
+    # # Handle timestamp with timezone
+    # if pyarrow.types.is_timestamp(arrow_type) and arrow_type.tz is not None:
+    #     return "timestamptz"
 
-        # # Special handling for timestamp types without timezone
-        # if pyarrow.types.is_timestamp(arrow_type):
-        #     return "timestamp"
+    # # Special handling for time types with different units
+    # if pyarrow.types.is_time(arrow_type):
+    #     return "time"
 
-        # # Special handling for duration/interval types with different units
-        # if pyarrow.types.is_duration(arrow_type):
-        #     return "interval"
+    # # Special handling for timestamp types without timezone
+    # if pyarrow.types.is_timestamp(arrow_type):
+    #     return "timestamp"
 
-        return pg_type
+    # # Special handling for duration/interval types with different units
+    # if pyarrow.types.is_duration(arrow_type):
+    #     return "interval"
 
-    return _resolve_type(field.type)
+    raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
 
 
 # Mapping between Arrow types and DuckDB column type names
@@ -537,9 +530,8 @@ ARROW_TO_DUCKDB_TYPES = {
     # pyarrow.float16(): "REAL",  # Note: gets converted to float32 internally
     pyarrow.float32(): "REAL",
     pyarrow.float64(): "DOUBLE",
-    # Decimal
-    pyarrow.decimal128(precision=38, scale=9): "DECIMAL",
-    pyarrow.decimal256(precision=76, scale=38): "DECIMAL",
+    # Decimal types are resolved with their precision and scale by
+    # _resolve_duckdb_type, so they are not listed here.
     # String types
     pyarrow.string(): "VARCHAR",
     pyarrow.large_string(): "VARCHAR",
@@ -599,61 +591,61 @@ def arrow_field_to_duckdb_type(field: Union[pyarrow.Field, pyarrow.DataType]) ->
     'STRUCT(x INTEGER, y VARCHAR)'
     """
 
-    def _resolve_type(
-        arrow_type: Union[pyarrow.Field, pyarrow.DataType]
-    ) -> Union[pyarrow.Field, pyarrow.DataType, str]:
-        """Internal helper to resolve type, handling nested cases."""
-        # Handle decimal types with custom precision/scale
-        if pyarrow.types.is_decimal(arrow_type):
-            return f"DECIMAL({arrow_type.precision}, {arrow_type.scale})"
-
-        # Handle list types (including large lists and fixed size lists)
-        if (
-            pyarrow.types.is_list(arrow_type)
-            or pyarrow.types.is_large_list(arrow_type)
-            or pyarrow.types.is_fixed_size_list(arrow_type)
-        ):
-            value_type = _resolve_type(arrow_type.value_type)
-            return f"{value_type}[]"
-
-        # TODO Consider adding support for these types, with testing.
-
-        # # Handle fixed size binary
-        # if pyarrow.types.is_fixed_size_binary(arrow_type):
-        #     return f'BLOB({arrow_type.byte_width})'
-
-        # # Handle dictionary types - use value type
-        # if pyarrow.types.is_dictionary(arrow_type):
-        #     return _resolve_type(arrow_type.value_type)
-
-        # # Handle timestamp with timezone
-        # if pyarrow.types.is_timestamp(arrow_type):
-        #     if arrow_type.tz is not None:
-        #         return 'TIMESTAMP WITH TIME ZONE'
-        #     return 'TIMESTAMP'
-
-        # # Handle struct types
-        # if pyarrow.types.is_struct(arrow_type):
-        #     fields = []
-        #     for field in arrow_type:
-        #         field_type = _resolve_type(field.type)
-        #         fields.append(f'{field.name} {field_type}')
-        #     return f'STRUCT({", ".join(fields)})'
-
-        # # Handle map types
-        # if pyarrow.types.is_map(arrow_type):
-        #     key_type = _resolve_type(arrow_type.key_type)
-        #     item_type = _resolve_type(arrow_type.item_type)
-        #     return f'MAP({key_type}, {item_type})'
-
-        # Look up base type
-        duckdb_type = ARROW_TO_DUCKDB_TYPES.get(arrow_type)
-        if duckdb_type is None:
-            raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
+    arrow_type = field.type if isinstance(field, pyarrow.Field) else field
+    return _resolve_duckdb_type(arrow_type)
+
+
+def _resolve_duckdb_type(arrow_type: pyarrow.DataType) -> str:
+    """Internal helper to resolve type, handling nested cases."""
+    # Look up base type first: this is the common case.
+    duckdb_type = ARROW_TO_DUCKDB_TYPES.get(arrow_type)
+    if duckdb_type is not None:
         return duckdb_type
 
-    arrow_type = field.type if isinstance(field, pyarrow.Field) else field
-    return _resolve_type(arrow_type)
+    # Handle decimal types with custom precision/scale
+    if pyarrow.types.is_decimal(arrow_type):
+        return f"DECIMAL({arrow_type.precision}, {arrow_type.scale})"
+
+    # Handle list types (including large lists and fixed size lists)
+    if (
+        pyarrow.types.is_list(arrow_type)
+        or pyarrow.types.is_large_list(arrow_type)
+        or pyarrow.types.is_fixed_size_list(arrow_type)
+    ):
+        value_type = _resolve_duckdb_type(arrow_type.value_type)
+        return f"{value_type}[]"
+
+    # TODO Consider adding support for these types, with testing.
+
+    # # Handle fixed size binary
+    # if pyarrow.types.is_fixed_size_binary(arrow_type):
+    #     return f'BLOB({arrow_type.byte_width})'
+
+    # # Handle dictionary types - use value type
+    # if pyarrow.types.is_dictionary(arrow_type):
+    #     return _resolve_duckdb_type(arrow_type.value_type)
+
+    # # Handle timestamp with timezone
+    # if pyarrow.types.is_timestamp(arrow_type):
+    #     if arrow_type.tz is not None:
+    #         return 'TIMESTAMP WITH TIME ZONE'
+    #     return 'TIMESTAMP'
+
+    # # Handle struct types
+    # if pyarrow.types.is_struct(arrow_type):
+    #     fields = []
+    #     for field in arrow_type:
+    #         field_type = _resolve_duckdb_type(field.type)
+    #         fields.append(f'{field.name} {field_type}')
+    #     return f'STRUCT({", ".join(fields)})'
+
+    # # Handle map types
+    # if pyarrow.types.is_map(arrow_type):
+    #     key_type = _resolve_duckdb_type(arrow_type.key_type)
+    #     item_type = _resolve_duckdb_type(arrow_type.item_type)
+    #     return f'MAP({key_type}, {item_type})'
+
+    raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
 
 
 ARROW_TO_SQLITE_TYPES: dict[pyarrow.Field, str] = {
@@ -732,12 +724,14 @@ def arrow_field_to_sqlite_type(field: Union[pyarrow.Field, pyarrow.DataType]) ->
     'TEXT'  # JSON encoded array
     """
 
-    def _resolve_type(arrow_type: pyarrow.DataType) -> str:
+    arrow_type = field.type if isinstance(field, pyarrow.Field) else field
+    sqlite_type = ARROW_TO_SQLITE_TYPES.get(arrow_type)
+    if sqlite_type is None:
         # TODO Consider adding support for these, with tests.
 
         # Handle dictionary types - use value type
         # if pyarrow.types.is_dictionary(arrow_type):
-        #     return _resolve_type(arrow_type.value_type)
+        #     return arrow_field_to_sqlite_type(arrow_type.value_type)
 
         # Handle timestamp with timezone - store as TEXT
         # if pyarrow.types.is_timestamp(arrow_type) and arrow_type.tz is not None:
@@ -753,14 +747,8 @@ def arrow_field_to_sqlite_type(field: Union[pyarrow.Field, pyarrow.DataType]) ->
         # ):
         #     return "TEXT"  # JSON encoded
 
-        # Look up base type
-        sqlite_type = ARROW_TO_SQLITE_TYPES.get(arrow_type)
-        if sqlite_type is None:
-            raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
-        return sqlite_type
-
-    arrow_type = field.type if isinstance(field, pyarrow.Field) else field
-    return _resolve_type(arrow_type)
+        raise ValueError(f"Unsupported PyArrow type: {arrow_type}")
+    return sqlite_type
 
 
 DIALECT_TO_TYPE_CONVERTER: dict[
@@ -780,19 +768,43 @@ def arrow_schema_to_column_defns(
 
     Example output: {'x': 'INTEGER NOT NULL'}
     """
-    columns = {}
+    # Return a fresh dict so that callers cannot mutate the cached result.
+    return dict(_arrow_schema_to_column_defns(_schema_cache_key(schema), dialect))
+
+
+def _schema_cache_key(
+    schema: pyarrow.Schema,
+) -> Tuple[Tuple[str, pyarrow.DataType, bool], ...]:
+    # pyarrow.Schema hashes its metadata, which is a dict (and always present
+    # on pandas-derived schemas), so key only on what affects the output.
+    return tuple((field.name, field.type, field.nullable) for field in schema)
+
+
+@functools.lru_cache(maxsize=256)
+def _arrow_schema_to_column_defns(
+    fields: Tuple[Tuple[str, pyarrow.DataType, bool], ...], dialect: DIALECTS
+) -> Tuple[Tuple[str, str], ...]:
     converter = DIALECT_TO_TYPE_CONVERTER[dialect]
-    for field in schema:
-        sql_type = converter(field)
-        nullable = "NULL" if field.nullable else "NOT NULL"
-        columns[field.name] = f"{sql_type} {nullable}"
-    return columns
+    columns = []
+    for name, type_, nullable in fields:
+        sql_type = converter(type_)
+        columns.append((name, f"{sql_type} {'NULL' if nullable else 'NOT NULL'}"))
+    return tuple(columns)
 
 
 def arrow_schema_to_create_table(
     schema: pyarrow.Schema, table_name: str, dialect: DIALECTS
 ) -> str:
-    columns = arrow_schema_to_column_defns(schema, dialect)
+    return _arrow_schema_to_create_table(_schema_cache_key(schema), table_name, dialect)
+
+
+@functools.lru_cache(maxsize=256)
+def _arrow_schema_to_create_table(
+    fields: Tuple[Tuple[str, pyarrow.DataType, bool], ...],
+    table_name: str,
+    dialect: DIALECTS,
+) -> str:
+    columns = dict(_arrow_schema_to_column_defns(fields, dialect))
     # Construct the CREATE TABLE statement
     create_statement = (
         f"""
@@ -806,6 +818,12 @@ def arrow_schema_to_create_table(
     return create_statement
 
 
+def _invalidate_schema_cache() -> None:
+    "Clear the cached results of arrow_schema_to_{column_defns,create_table}."
+    _arrow_schema_to_column_defns.cache_clear()
+    _arrow_schema_to_create_table.cache_clear()
+
+
 TABLE_NAME_PATTERN = re.compile(r"^[a-zA-Z][a-zA-Z0-9_]*$")
 
 
@@ -9,7 +9,6 @@ from typing import Any, Mapping, Optional, cast
 
 import httpx
 from fastapi import APIRouter, Request
-from jose import JWTError, jwt
 from pydantic import Secret
 from starlette.responses import RedirectResponse
 
@@ -182,6 +181,8 @@ properties:
         )
 
     async def authenticate(self, request: Request) -> Optional[UserSessionState]:
+        from jose import JWTError, jwt
+
         code = request.query_params["code"]
         # A proxy in the middle may make the request into something like
         # 'http://localhost:8000/...' so we fix the first part but keep
@@ -1,10 +1,12 @@
+import functools
 import hashlib
 import uuid as uuid_module
 from datetime import datetime, timezone
 
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.sql import func
 
 from .base import Base
@@ -25,6 +27,17 @@ ALL_REVISIONS = [
 REQUIRED_REVISION = ALL_REVISIONS[0]
 
 
+@functools.lru_cache(maxsize=1024)
+def uuid_from_hex(value):
+    """
+    Parse a UUID from its hex representation, as found in tokens.
+
+    UUID parsing is pure Python, and the same few principals and sessions
+    present their tokens over and over, so cache the (immutable) results.
+    """
+    return uuid_module.UUID(hex=value)
+
+
 async def create_default_roles(db):
     db.add_all(
         [
@@ -98,24 +111,17 @@ async def purge_expired(db, cls):
 async def create_user(db, identity_provider, id):
     user_role = (await db.execute(select(Role).filter(Role.name == "user"))).scalar()
     assert user_role is not None, "User role is missing from Roles table"
-    principal = Principal(type="user", roles=[user_role])
-    db.add(principal)
-    await db.commit()
-    identity = Identity(
-        provider=identity_provider,
-        id=id,
-        principal_id=principal.id,
+    principal = Principal(
+        type="user",
+        roles=[user_role],
+        identities=[Identity(provider=identity_provider, id=id)],
     )
-    db.add(identity)
-    await db.commit()
-    refreshed_principal = (
-        await db.execute(
-            select(Principal)
-            .filter(Principal.id == principal.id)
-            .options(selectinload(Principal.identities))
-        )
-    ).scalar()
-    return refreshed_principal
+    db.add(principal)
+    # Flush, rather than commit, so that the new Principal and Identity are
+    # committed in one transaction with the caller's further changes.
+    # The caller is responsible for committing.
+    await db.flush()
+    return principal
 
 
 async def create_service(db, role):
@@ -138,10 +144,11 @@ async def lookup_valid_session(db, session_id):
         await db.execute(
             select(Session)
             .options(
-                selectinload(Session.principal).selectinload(Principal.roles),
-                selectinload(Session.principal).selectinload(Principal.identities),
+                # Load the Principal (and, eagerly by default, its Roles) in the
+                # same query as the Session, and its Identities in one more.
+                joinedload(Session.principal).selectinload(Principal.identities),
             )
-            .filter(Session.uuid == uuid_module.UUID(hex=session_id))
+            .filter(Session.uuid == uuid_from_hex(session_id))
         )
     ).scalar()
     if session is None:
@@ -155,6 +162,38 @@ async def lookup_valid_session(db, session_id):
     return session
 
 
+async def revoke_valid_session(db, session_id, *, principal_uuid):
+    """
+    Mark a Session as revoked, in one UPDATE statement.
+
+    Only a Session of the Principal with the given principal_uuid is revoked.
+    Pass principal_uuid=None only when the caller has otherwise proven that it
+    owns the Session, e.g. by presenting its signed refresh token.
+
+    Return False if there is no such (unexpired) Session in scope.
+    """
+    if isinstance(session_id, int):
+        # Old versions of tiled used an integer sid.
+        return False
+    statement = (
+        update(Session)
+        .where(Session.uuid == uuid_from_hex(session_id))
+        .where(Session.expiration_time > datetime.now(timezone.utc))
+        .values(revoked=True)
+        # No Session is loaded, so there is nothing to synchronize.
+        .execution_options(synchronize_session=False)
+    )
+    if principal_uuid is not None:
+        statement = statement.where(
+            Session.principal_id.in_(
+                select(Principal.id).where(Principal.uuid == principal_uuid)
+            )
+        )
+    result = await db.execute(statement)
+    await db.commit()
+    return result.rowcount > 0
+
+
 async def lookup_valid_pending_session_by_device_code(db, device_code):
     hashed_device_code = hashlib.sha256(device_code).digest()
     pending_session = (
@@ -1,7 +1,8 @@
+import functools
 import hashlib
 import secrets
+import time
 import uuid as uuid_module
-import warnings
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any, Optional, Sequence, Union
@@ -24,6 +25,7 @@ from fastapi.security import (
 from fastapi.security.api_key import APIKeyCookie, APIKeyHeader, APIKeyQuery
 from fastapi.security.utils import get_authorization_scheme_param
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -39,15 +41,6 @@ from starlette.status import (
 
 from tiled.scopes import NO_SCOPES, PUBLIC_SCOPES, USER_SCOPES
 
-# To hide third-party warning
-# .../jose/backends/cryptography_backend.py:18: CryptographyDeprecationWarning:
-#     int_from_bytes is deprecated, use int.from_bytes instead
-with warnings.catch_warnings():
-    warnings.simplefilter("ignore")
-    from jose import ExpiredSignatureError, JWTError, jwt
-
-from pydantic import BaseModel
-
 from ..authn_database import orm
 from ..authn_database.connection_pool import get_database_session
 from ..authn_database.core import (
@@ -58,8 +51,11 @@ from ..authn_database.core import (
     lookup_valid_pending_session_by_device_code,
     lookup_valid_pending_session_by_user_code,
     lookup_valid_session,
+    revoke_valid_session,
+    uuid_from_hex,
 )
 from ..utils import SHARE_TILED_PATH, SpecialUsers
+from . import jwt_backend as jwt
 from . import schemas
 from .core import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, json_or_msgpack
 from .protocols import ExternalAuthenticator, InternalAuthenticator, UserSessionState
@@ -126,14 +122,15 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="PLACEHOLDER", auto_error=False)
 
 def create_access_token(data, secret_key, expires_delta):
     to_encode = data.copy()
-    expire = utcnow() + expires_delta
+    # The exp claim is a Unix timestamp, so there is no need for a datetime.
+    expire = int(time.time() + expires_delta.total_seconds())
     to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, secret_key, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def create_refresh_token(session_id, secret_key, expires_delta):
-    expire = utcnow() + expires_delta
+    expire = int(time.time() + expires_delta.total_seconds())
     to_encode = {
         "type": "refresh",
         "sid": session_id,
@@ -143,6 +140,15 @@ def create_refresh_token(session_id, secret_key, expires_delta):
     return encoded_jwt
 
 
+@functools.lru_cache(maxsize=1)
+def _secret_keys_by_id(secret_keys):
+    keys_by_id = {}
+    for secret_key in secret_keys:
+        # Key ids are short hashes, so allow (unlikely) collisions.
+        keys_by_id.setdefault(jwt.key_id(secret_key), []).append(secret_key)
+    return keys_by_id
+
+
 def decode_token(token, secret_keys):
     credentials_exception = HTTPException(
         status_code=HTTP_401_UNAUTHORIZED,
@@ -150,19 +156,37 @@ def decode_token(token, secret_keys):
         headers={"WWW-Authenticate": "Bearer"},
     )
     # The first key in settings.secret_keys is used for *encoding*.
-    # All keys are tried for *decoding* until one works or they all
-    # fail. They supports key rotation.
-    for secret_key in secret_keys:
+    # Tokens name the key that signed them in their "kid" header, so only
+    # that key is tried for *decoding*. Tokens issued without a kid, by
+    # earlier versions of tiled, are tried against all keys. This supports
+    # key rotation.
+    try:
+        key_id = jwt.get_unverified_header(token).get("kid")
+    except jwt.JWTError:
+        raise credentials_exception
+    if key_id is None:
+        candidate_keys = secret_keys
+    else:
+        candidate_keys = _secret_keys_by_id(tuple(secret_keys)).get(key_id, [])
+    # Try every candidate key, rather than stopping at the first one that
+    # works, so that the time taken does not reveal which key signed the token.
+    payload = None
+    expired = None
+    for secret_key in candidate_keys:
         try:
-            payload = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
-            break
-        except ExpiredSignatureError:
-            # Do not let this be caught below with the other JWTError types.
-            raise
-        except JWTError:
+            verified_payload = jwt.decode(token, secret_key, algorithms=[ALGORITHM])
+        except jwt.ExpiredSignatureError as err:
+            # Do not let this be treated like the other JWTError types.
+            expired = err
+        except jwt.JWTError:
             # Try the next key in the key rotation.
-            continue
-    else:
+            pass
+        else:
+            if payload is None:
+                payload = verified_payload
+    if payload is None:
+        if expired is not None:
+            raise expired
         raise credentials_exception
     return payload
 
@@ -211,14 +235,20 @@ async def get_decoded_access_token(
 ):
     if not access_token:
         return None
+    # FastAPI caches dependencies per set of security scopes, so this may be
+    # resolved more than once in a request. Verify the token only once.
+    payload = getattr(request.state, "jwt_payload", None)
+    if payload is not None:
+        return payload
     try:
         payload = decode_token(access_token, settings.secret_keys)
-    except ExpiredSignatureError:
+    except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=HTTP_401_UNAUTHORIZED,
             detail="Access token has expired. Refresh token.",
             headers=headers_for_401(request, security_scopes),
         )
+    request.state.jwt_payload = payload
     return payload
 
 
@@ -236,16 +266,30 @@ async def move_api_key(request: Request, api_key: Optional[str] = Depends(get_ap
         )
 
 
+@functools.lru_cache(maxsize=1)
+def _encode_api_key(api_key: str) -> bytes:
+    return api_key.encode()
+
+
+def check_single_user_api_key(api_key: str, settings: Settings) -> bool:
+    """
+    Compare an API key to the single-user API key in constant time.
+
+    The comparison is done on bytes: the configured key is encoded once, and
+    secrets.compare_digest rejects str with non-ASCII characters, which may
+    appear in the key under test.
+    """
+    return secrets.compare_digest(
+        api_key.encode(), _encode_api_key(settings.single_user_api_key)
+    )
+
+
 async def get_scopes_from_api_key(
     api_key: str, settings: Settings, authenticated: bool, db: Optional[AsyncSession]
 ) -> Sequence[str]:
     if not authenticated:
         # Tiled is in a "single user" mode with only one API key.
-        return (
-            USER_SCOPES
-            if secrets.compare_digest(api_key, settings.single_user_api_key)
-            else set()
-        )
+        return USER_SCOPES if check_single_user_api_key(api_key, settings) else set()
     # Tiled is in a multi-user configuration with authentication providers.
     # We store the hashed value of the API key secret.
     # By comparing hashes we protect against timing attacks.
@@ -372,7 +416,7 @@ async def get_current_principal(
                 )
         else:
             # Tiled is in a "single user" mode with only one API key.
-            if secrets.compare_digest(api_key, settings.single_user_api_key):
+            if check_single_user_api_key(api_key, settings):
                 principal = SpecialUsers.admin
             else:
                 raise HTTPException(
@@ -381,13 +425,16 @@ async def get_current_principal(
                     headers=headers_for_401(request, security_scopes),
                 )
     elif decoded_access_token is not None:
-        principal = schemas.Principal(
-            uuid=uuid_module.UUID(hex=decoded_access_token["sub"]),
-            type=decoded_access_token["sub_typ"],
-            identities=[
-                schemas.Identity(id=identity["id"], provider=identity["idp"])
-                for identity in decoded_access_token["ids"]
-            ],
+        # Validate in one pass, letting pydantic build the nested Identities.
+        principal = schemas.Principal.model_validate(
+            {
+                "uuid": uuid_from_hex(decoded_access_token["sub"]),
+                "type": decoded_access_token["sub_typ"],
+                "identities": [
+                    {"id": identity["id"], "provider": identity["idp"]}
+                    for identity in decoded_access_token["ids"]
+                ],
+            }
         )
     else:
         # No form of authentication is present.
@@ -429,7 +476,11 @@ async def create_session(
     identity = (
         await db.execute(
             select(orm.Identity)
-            .options(selectinload(orm.Identity.principal))
+            .options(
+                selectinload(orm.Identity.principal).selectinload(
+                    orm.Principal.identities
+                )
+            )
             .filter(orm.Identity.id == id)
             .filter(orm.Identity.provider == identity_provider)
         )
@@ -460,26 +511,17 @@ async def create_session(
             f"than or equal to the maximum number allowed, {SESSION_LIMIT}. "
             "Some Sessions must be closed before creating new ones.",
         )
+    # The Principal, with its Roles and Identities, is already loaded, and the
+    # Session uuid is generated client-side, so there is no need to reload the
+    # Session after inserting it.
     session = orm.Session(
-        principal_id=principal.id,
+        principal=principal,
         expiration_time=utcnow() + settings.session_max_age,
         state=state or {},
     )
     db.add(session)
     await db.commit()
-    # Relaod to select Principal and Identiies.
-    fully_loaded_session = (
-        await db.execute(
-            select(orm.Session)
-            .options(
-                selectinload(orm.Session.principal).selectinload(
-                    orm.Principal.identities
-                ),
-            )
-            .filter(orm.Session.id == session.id)
-        )
-    ).scalar()
-    return fully_loaded_session
+    return session
 
 
 async def create_tokens_from_session(settings, db, session, provider):
@@ -511,13 +553,10 @@ async def create_tokens_from_session(settings, db, session, provider):
     # Once you are logged in, it does not matter *how* you logged in.
     # But in order to enable UIs to display a sensible username we provide
     # this information alongside the tokens only when the session is first created.
-    identity = (
-        await db.execute(
-            select(orm.Identity)
-            .filter(orm.Identity.principal == principal)
-            .filter(orm.Identity.provider == provider)
-        )
-    ).scalar()
+    # The Identities are already loaded, so pick it out without a query.
+    identity = next(
+        identity for identity in principal.identities if identity.provider == provider
+    )
     return {
         "access_token": access_token,
         "expires_in": settings.access_token_max_age / UNIT_SECOND,
@@ -984,7 +1023,7 @@ def authentication_router() -> APIRouter:
         new_tokens = await slide_session(refresh_token.refresh_token, settings, db)
         return new_tokens
 
-    @router.post("/session/revoke")
+    @router.post("/session/revoke", status_code=HTTP_204_NO_CONTENT)
     async def revoke_session(
         request: Request,
         refresh_token: schemas.RefreshToken,
@@ -995,16 +1034,11 @@ def authentication_router() -> APIRouter:
         request.state.endpoint = "auth"
         payload = decode_token(refresh_token.refresh_token, settings.secret_keys)
         session_id = payload["sid"]
-        # Find this session in the database.
-        session = await lookup_valid_session(db, session_id)
-        if session is None:
+        # The signed refresh token proves ownership of the Session.
+        if not await revoke_valid_session(db, session_id, principal_uuid=None):
             raise HTTPException(HTTP_409_CONFLICT, detail=f"No session {session_id}")
-        session.revoked = True
-        db.add(session)
-        await db.commit()
-        return Response(status_code=HTTP_204_NO_CONTENT)
 
-    @router.delete("/session/revoke/{session_id}")
+    @router.delete("/session/revoke/{session_id}", status_code=HTTP_204_NO_CONTENT)
     async def revoke_session_by_id(
         session_id: str,  # from path parameter
         request: Request,
@@ -1015,39 +1049,29 @@ def authentication_router() -> APIRouter:
     ):
         "Mark a Session as revoked so it cannot be refreshed again."
         request.state.endpoint = "auth"
-        # Find this session in the database.
-        session = await lookup_valid_session(db, session_id)
-        if session is None:
-            raise HTTPException(404, detail=f"No session {session_id}")
-        if principal.uuid != session.principal.uuid:
-            # TODO Add a scope for doing this for other users.
+        # Only a Session of the requester may be revoked.
+        # TODO Add a scope for doing this for other users.
+        if not await revoke_valid_session(
+            db, session_id, principal_uuid=principal.uuid
+        ):
             raise HTTPException(
                 HTTP_404_NOT_FOUND,
                 detail="Sessions does not exist or requester has insufficient permissions",
             )
-        session.revoked = True
-        db.add(session)
-        await db.commit()
-        return Response(status_code=HTTP_204_NO_CONTENT)
 
     async def slide_session(refresh_token, settings, db):
         try:
             payload = decode_token(refresh_token, settings.secret_keys)
-        except ExpiredSignatureError:
+        except jwt.ExpiredSignatureError:
             raise HTTPException(
                 status_code=HTTP_401_UNAUTHORIZED,
                 detail="Session has expired. Please re-authenticate.",
             )
-        # Find this session in the database.
+        # Find this session in the database. Expired sessions are not found.
         session = await lookup_valid_session(db, payload["sid"])
-        now = utcnow()
         # This token is *signed* so we know that the information came from us.
         # If the Session is forgotten or revoked or expired, do not allow refresh.
-        if (
-            (session is None)
-            or session.revoked
-            or (session.expiration_time.replace(tzinfo=timezone.utc) < now)
-        ):
+        if (session is None) or session.revoked:
             # Do not leak (to a potential attacker) whether this has been *revoked*
             # specifically. Give the same error as if it had expired.
             raise HTTPException(
@@ -1055,7 +1079,7 @@ def authentication_router() -> APIRouter:
                 detail="Session has expired. Please re-authenticate.",
             )
         # Update Session info.
-        session.time_last_refreshed = now
+        session.time_last_refreshed = utcnow()
         # This increments in a way that avoids a race condition.
         session.refresh_count = orm.Session.refresh_count + 1
         # Update the database.
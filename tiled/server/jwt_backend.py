@@ -0,0 +1,150 @@
+"""
+HS256 JSON Web Tokens for the access and refresh tokens issued by tiled itself
+
+Only what tiled needs is implemented: signing with HMAC-SHA256 and, on decode,
+verifying the signature and the registered time claims (exp, nbf). Tokens from
+external OIDC providers are verified in tiled.authenticators, with python-jose.
+
+The interface mirrors the subset of jose.jwt that tiled used, so tokens issued
+by earlier versions of tiled remain valid and vice versa.
+"""
+
+import base64
+import calendar
+import functools
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Sequence, Union
+
+import orjson
+
+ALGORITHM = "HS256"
+TIME_CLAIMS = ("exp", "iat", "nbf")
+
+
+class JWTError(Exception):
+    "The token could not be decoded or verified."
+
+
+class ExpiredSignatureError(JWTError):
+    "The token is valid but its exp claim has passed."
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _as_bytes(key: Union[str, bytes]) -> bytes:
+    return key.encode() if isinstance(key, str) else key
+
+
+def _timestamp(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    return value
+
+
+def key_id(key: Union[str, bytes]) -> str:
+    "A short identifier of a secret key, to name it in the kid header of tokens"
+    return hashlib.sha256(_as_bytes(key)).hexdigest()[:8]
+
+
+@functools.lru_cache(maxsize=8)
+def _header_segment(key: Union[str, bytes]) -> bytes:
+    # Every token signed with a given key has the same header, so encode it once.
+    header = {"alg": ALGORITHM, "typ": "JWT", "kid": key_id(key)}
+    return _b64encode(orjson.dumps(header))
+
+
+@functools.lru_cache(maxsize=8)
+def _keyed_hmac(key: Union[str, bytes]) -> "hmac.HMAC":
+    "An HMAC keyed with key but fed no message, to be copied for each token"
+    # Keys are cached as given (usually str, from settings), so they are
+    # encoded to bytes here once rather than on every call.
+    return hmac.new(_as_bytes(key), digestmod=hashlib.sha256)
+
+
+def _sign(signing_input: bytes, key: Union[str, bytes]) -> bytes:
+    # Copying the keyed HMAC skips re-deriving the inner and outer padded key
+    # state on every call. There are only ever a few (rotated) secret keys.
+    mac = _keyed_hmac(key).copy()
+    mac.update(signing_input)
+    return mac.digest()
+
+
+def encode(
+    claims: Mapping[str, Any], key: Union[str, bytes], algorithm: str = ALGORITHM
+) -> str:
+    "Encode and sign claims. Datetimes in time claims become Unix timestamps."
+    if algorithm != ALGORITHM:
+        raise JWTError(f"Algorithm not supported: {algorithm}")
+    payload = dict(claims)
+    for claim in TIME_CLAIMS:
+        if claim in payload:
+            payload[claim] = _timestamp(payload[claim])
+    # Non-str keys (e.g. in the session state) become strings, as with json.dumps.
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    signing_input = _header_segment(key) + b"." + _b64encode(body)
+    signature = _sign(signing_input, key)
+    return (signing_input + b"." + _b64encode(signature)).decode()
+
+
+def get_unverified_header(token: Union[str, bytes]) -> Dict[str, Any]:
+    "Return the header of a token, without verifying the token."
+    if isinstance(token, str):
+        token = token.encode()
+    try:
+        header = orjson.loads(_b64decode(token.split(b".", 1)[0]))
+    except ValueError as err:
+        raise JWTError("Error decoding token header") from err
+    if not isinstance(header, dict):
+        raise JWTError("Invalid token header")
+    # The kid is used to look up a key, so it must be hashable.
+    if not isinstance(header.get("kid", ""), str):
+        raise JWTError("Invalid kid header, must be a string")
+    return header
+
+
+def decode(
+    token: Union[str, bytes],
+    key: Union[str, bytes],
+    algorithms: Sequence[str] = (ALGORITHM,),
+) -> Dict[str, Any]:
+    "Verify the signature and time claims of a token and return its claims."
+    if isinstance(token, str):
+        token = token.encode()
+    try:
+        signing_input, signature_segment = token.rsplit(b".", 1)
+        header_segment, payload_segment = signing_input.split(b".", 1)
+        header = orjson.loads(_b64decode(header_segment))
+        payload = orjson.loads(_b64decode(payload_segment))
+        signature = _b64decode(signature_segment)
+    except ValueError as err:  # includes binascii.Error and orjson.JSONDecodeError
+        raise JWTError("Error decoding token") from err
+    if not (isinstance(header, dict) and isinstance(payload, dict)):
+        raise JWTError("Invalid token")
+    if header.get("alg") != ALGORITHM or ALGORITHM not in algorithms:
+        raise JWTError("The specified alg value is not allowed")
+    if not hmac.compare_digest(signature, _sign(signing_input, key)):
+        raise JWTError("Signature verification failed")
+    _validate_time_claims(payload)
+    return payload
+
+
+def _validate_time_claims(payload: Mapping[str, Any]) -> None:
+    now = calendar.timegm(datetime.now(timezone.utc).utctimetuple())
+    for claim in TIME_CLAIMS:
+        if claim in payload and not (
+            isinstance(payload[claim], (int, float))
+            and not isinstance(payload[claim], bool)
+        ):
+            raise JWTError(f"Invalid {claim} claim, must be a number")
+    if "nbf" in payload and payload["nbf"] > now:
+        raise JWTError("The token is not yet valid (nbf)")
+    if "exp" in payload and payload["exp"] < now:
+        raise ExpiredSignatureError("Signature has expired.")